@@ -0,0 +1,9 @@
+import pytest
+
+from model.train import train_and_save
+
+
+@pytest.fixture(scope="session")
+def trained_model(tmp_path_factory):
+    """(vectorizer, classifier) trained by the real pipeline into a temp dir."""
+    return train_and_save(str(tmp_path_factory.mktemp("model")))
@@ -5,14 +5,25 @@ AI-powered symptom triage and risk prioritization API.
 
 import os
 import re
+import sys
 import json
+import glob
+import time
+import bisect
+import asyncio
 import datetime
+import functools
+from collections import Counter
+from collections.abc import Iterator
 from contextlib import asynccontextmanager
+from typing import BinaryIO
 
-import joblib
+import ahocorasick
 import numpy as np
+import orjson
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 # ---------------------------------------------------------------------------
@@ -21,37 +32,139 @@ from pydantic import BaseModel
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_DIR = os.path.join(BASE_DIR, "model")
 LOG_DIR = os.path.join(BASE_DIR, "logs")
-LOG_FILE = os.path.join(LOG_DIR, "assessments.json")
+LOG_FILE = os.path.join(LOG_DIR, "assessments.jsonl")
+
+# Background log writer: flush every LOG_FLUSH_INTERVAL seconds or once the
+# pending buffer reaches LOG_FLUSH_BYTES, whichever comes first.
+LOG_FLUSH_INTERVAL = 0.05
+LOG_FLUSH_BYTES = 64 * 1024
+# The writer moves the log aside to a timestamped segment past this size
+LOG_ROTATE_BYTES = 64 * 1024 * 1024
+# After a failed rotation, wait this many seconds before trying again
+LOG_ROTATE_RETRY = 60.0
 
 # ---------------------------------------------------------------------------
 # Globals (populated on startup)
 # ---------------------------------------------------------------------------
 vectorizer = None
 classifier = None
+high_idx = -1  # index of the "High" class in classifier.classes_, -1 if absent
+fast_predict = False  # True when predict_high_prob can bypass sklearn (see load_model)
+fused_w = None  # classifier.coef_ * vectorizer.idf_ as float32, shape (n_classes, n_features)
+coef_b = None  # classifier.intercept_ as float32, shape (n_classes,)
+vocab: dict[str, int] = {}  # vectorizer.vocabulary_
+idf = None  # vectorizer.idf_
+token_re = re.compile(r"(?u)\b\w\w+\b")  # TfidfVectorizer's default token_pattern
+ngram_range = (1, 1)  # vectorizer.ngram_range
+log_queue: asyncio.Queue | None = None
+rotate_retry_at = 0.0  # time.monotonic() before which rotation is not retried
 
 # ---------------------------------------------------------------------------
-# Lifespan — load / train model on startup
+# Model loading and lifespan — load / train model on startup
 # ---------------------------------------------------------------------------
 
+# TfidfVectorizer settings the fused predict path reproduces; a model saved
+# with anything else is scored through vectorizer.transform + predict_proba.
+FAST_VECTORIZER_SETTINGS = {
+    "analyzer": "word",
+    "lowercase": True,
+    "norm": "l2",
+    "use_idf": True,
+    "sublinear_tf": False,
+    "binary": False,
+    "stop_words": None,
+    "strip_accents": None,
+    "preprocessor": None,
+    "tokenizer": None,
+}
+
+
+def _supports_fast_predict(vec, clf) -> bool:
+    """Return True if predict_high_prob can score this model without sklearn."""
+    if not hasattr(vec, "idf_"):
+        return False
+    if any(getattr(vec, k, None) != v for k, v in FAST_VECTORIZER_SETTINGS.items()):
+        return False
+    # The fused path is a multinomial softmax; binary and one-vs-rest use
+    # sigmoids. sklearn picks one-vs-rest for these solvers under "auto".
+    multi_class = getattr(clf, "multi_class", "auto")
+    return (
+        clf.coef_.shape[0] > 1
+        and multi_class != "ovr"
+        and not (
+            multi_class in ("auto", "deprecated")
+            and clf.solver in ("liblinear", "newton-cholesky")
+        )
+    )
+
+
+def _fused_matches_sklearn() -> bool:
+    """Probe the fused predictor against predict_proba on a vocabulary-rich text."""
+    probe = " ".join(list(vocab)[:20])
+    expected = classifier.predict_proba(vectorizer.transform([probe]))[0]
+    return bool(np.allclose(_fused_proba(probe), expected, atol=1e-5))
+
+
+def load_model(vec, clf) -> None:
+    """Install a fitted vectorizer/classifier pair and precompute inference state."""
+    global vectorizer, classifier, high_idx, fast_predict, fused_w, coef_b
+    global vocab, idf, token_re, ngram_range
+
+    vectorizer, classifier = vec, clf
+    classes = classifier.classes_
+    high_idx = int(np.where(classes == "High")[0][0]) if "High" in classes else -1
+    _cached_analyze_symptoms.cache_clear()
+
+    fast_predict = _supports_fast_predict(vectorizer, classifier)
+    if not fast_predict:
+        print("[*] Model settings not supported by the fused predictor -- using sklearn.")
+        return
+
+    vocab = vectorizer.vocabulary_
+    idf = vectorizer.idf_
+    if vectorizer.token_pattern != token_re.pattern:
+        token_re = re.compile(vectorizer.token_pattern)
+    ngram_range = vectorizer.ngram_range
+    # Fold idf into the class weights so inference is one dot product per class.
+    # Kept as float32 rather than int8: the matrix is only n_classes x 500, and
+    # the dequantize step per request would cost more than it saves.
+    fused_w = (classifier.coef_ * idf).astype(np.float32)
+    coef_b = classifier.intercept_.astype(np.float32)
+
+    if not _fused_matches_sklearn():
+        fast_predict = False
+        print("[*] Fused predictor disagrees with sklearn on probe text -- using sklearn.")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global vectorizer, classifier
+    global log_queue
 
     vec_path = os.path.join(MODEL_DIR, "vectorizer.joblib")
     clf_path = os.path.join(MODEL_DIR, "classifier.joblib")
 
     if os.path.exists(vec_path) and os.path.exists(clf_path):
-        vectorizer = joblib.load(vec_path)
-        classifier = joblib.load(clf_path)
+        import joblib
+        vec = joblib.load(vec_path)
+        clf = joblib.load(clf_path)
         print("[OK] Loaded existing model artifacts.")
     else:
         print("[*] No saved model found -- training now...")
         from model.train import train_and_save
-        vectorizer, classifier = train_and_save(MODEL_DIR)
+        vec, clf = train_and_save(MODEL_DIR)
+    load_model(vec, clf)
 
     os.makedirs(LOG_DIR, exist_ok=True)
+    log_queue = asyncio.Queue()
+    writer = asyncio.create_task(_log_writer(log_queue))
+
     yield
 
+    # Drain pending log entries before shutting down
+    log_queue.put_nowait(None)
+    await writer
+    log_queue = None
+
 # ---------------------------------------------------------------------------
 # App
 # ---------------------------------------------------------------------------
@@ -60,6 +173,7 @@ app = FastAPI(
     description="AI-powered symptom triage and risk prioritization.",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -99,6 +213,10 @@ CRITICAL_PATTERNS: list[tuple[str, ...]] = [
     ("loss of consciousness",),
 ]
 
+CRITICAL_GROUPS: list[frozenset[str]] = [
+    frozenset(sys.intern(p) for p in g) for g in CRITICAL_PATTERNS
+]
+
 COMORBIDITY_ALIASES: dict[str, str] = {
     "diabetes": "diabetes",
     "hypertension": "hypertension",
@@ -112,7 +230,8 @@ COMORBIDITY_ALIASES: dict[str, str] = {
     "immunodeficiency": "immunodeficiency",
 }
 
-KNOWN_SYMPTOMS = [
+# Canonical lowercase phrases, interned so matches share one string object
+KNOWN_SYMPTOMS: tuple[str, ...] = tuple(sys.intern(s) for s in (
     "headache", "fever", "cough", "sore throat", "nausea", "vomiting",
     "diarrhea", "fatigue", "weakness", "dizziness", "chest pain",
     "shortness of breath", "breathlessness", "sweating", "chills",
@@ -124,40 +243,50 @@ KNOWN_SYMPTOMS = [
     "chest tightness", "palpitations", "difficulty breathing",
     "loss of appetite", "weight loss", "night sweats",
     "stiff neck", "earache", "eye pain", "throat swelling",
-]
+))
 
 
-def extract_symptoms(text: str) -> list[str]:
-    """Extract recognisable symptom phrases from free-text."""
-    text_lower = text.lower()
-    found: list[str] = []
-    for symptom in KNOWN_SYMPTOMS:
-        if symptom in text_lower:
-            found.append(symptom)
-    # Also capture multi-word critical phrases
-    for pattern_group in CRITICAL_PATTERNS:
-        for p in pattern_group:
-            if p in text_lower and p not in found:
-                found.append(p)
-    return list(dict.fromkeys(found))  # preserve order, dedupe
+def _build_symptom_automaton() -> ahocorasick.Automaton:
+    """Build one Aho-Corasick automaton over all known and critical phrases."""
+    automaton = ahocorasick.Automaton()
+    for phrase in (*KNOWN_SYMPTOMS, *(p for group in CRITICAL_GROUPS for p in group)):
+        automaton.add_word(phrase, phrase)
+    automaton.make_automaton()
+    return automaton
 
 
-def check_critical_override(text: str) -> bool:
-    """Return True if any critical symptom pattern is present."""
-    text_lower = text.lower()
-    for pattern_group in CRITICAL_PATTERNS:
-        if all(p in text_lower for p in pattern_group):
-            return True
-    return False
+SYMPTOM_AUTOMATON = _build_symptom_automaton()
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase text for matching; full casefolding is only needed for non-ASCII input."""
+    return text.lower() if text.isascii() else text.casefold()
+
+
+def extract_symptoms(text_lower: str) -> list[str]:
+    """Extract recognisable symptom phrases from lowercased free-text in a single pass."""
+    # preserve order of first mention, dedupe
+    return list(dict.fromkeys(p for _, p in SYMPTOM_AUTOMATON.iter(text_lower)))
+
+
+def check_critical_override(found_set: set[str]) -> bool:
+    """Return True if any critical symptom pattern is among the detected phrases."""
+    return any(group <= found_set for group in CRITICAL_GROUPS)
+
+
+# Age bands: <40, 40–60, above 60 (ages are whole years)
+AGE_BREAKS = (40, 61)
+AGE_FACTORS = (0.0, 1.0, 2.0)
+AGE_INFO = (
+    "Age {} is within low-risk range.",
+    "Age {} (40–60) increased risk by +1.",
+    "Age {} (above 60) increased risk by +2.",
+)
 
 
 def compute_age_factor(age: int) -> tuple[float, str]:
-    if age > 60:
-        return 2.0, f"Age {age} (above 60) increased risk by +2."
-    elif age >= 40:
-        return 1.0, f"Age {age} (40–60) increased risk by +1."
-    else:
-        return 0.0, f"Age {age} is within low-risk range."
+    band = bisect.bisect_right(AGE_BREAKS, age)
+    return AGE_FACTORS[band], AGE_INFO[band].format(age)
 
 
 def compute_comorbidity_factor(comorbidities: list[str]) -> tuple[float, str]:
@@ -209,24 +338,245 @@ def build_explanation(
     return " ".join(parts)
 
 
+def term_counts(text_lower: str) -> Counter:
+    """Count vocabulary n-grams in lowercased text, keyed by feature index."""
+    words = token_re.findall(text_lower)
+    min_n, max_n = ngram_range
+    terms: list[str] = []
+    for n in range(min_n, min(max_n, len(words)) + 1):
+        terms.extend(" ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+    return Counter(vocab[t] for t in terms if t in vocab)
+
+
+def _fused_proba(text_lower: str) -> np.ndarray:
+    """Class probabilities from the fused TF-IDF + multinomial logistic regression.
+
+    Term counts are dotted with the idf-weighted class coefficients and
+    scaled by the L2 norm of the TF-IDF row, so no feature vector is
+    materialised.
+    """
+    counts = term_counts(text_lower)
+    z = coef_b.astype(np.float64)
+    if counts:
+        indices = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        tfidf = tf * idf[indices]
+        z += (fused_w[:, indices] @ tf) / np.sqrt(tfidf @ tfidf)
+    z -= z.max()
+    e = np.exp(z)
+    return e / e.sum()
+
+
+def predict_high_prob(text_lower: str) -> float:
+    """Return the model's High-risk probability (or its max class probability)."""
+    if fast_predict:
+        probas = _fused_proba(text_lower)
+    else:
+        probas = classifier.predict_proba(vectorizer.transform([text_lower]))[0]
+    return float(probas[high_idx]) if high_idx >= 0 else float(probas.max())
+
+
+SYMPTOM_CACHE_SIZE = 4096
+# Longer texts bypass the cache so clients cannot pin large strings in memory
+SYMPTOM_CACHE_MAX_CHARS = 1000
+
+
+def _analyze_symptoms(text_lower: str) -> tuple[tuple[str, ...], float, bool]:
+    """Return (detected symptoms, High-risk probability, critical flag) for symptom text."""
+    detected = extract_symptoms(text_lower)
+    critical = check_critical_override(set(detected))
+
+    # A critical override forces High risk, so the model is not consulted
+    if critical:
+        return tuple(detected), 1.0, True
+
+    return tuple(detected), predict_high_prob(text_lower), False
+
+
+_cached_analyze_symptoms = functools.lru_cache(maxsize=SYMPTOM_CACHE_SIZE)(_analyze_symptoms)
+
+
+def analyze_symptoms(text_lower: str) -> tuple[tuple[str, ...], float, bool]:
+    """Memoised _analyze_symptoms for texts up to SYMPTOM_CACHE_MAX_CHARS long."""
+    if len(text_lower) > SYMPTOM_CACHE_MAX_CHARS:
+        return _analyze_symptoms(text_lower)
+    return _cached_analyze_symptoms(text_lower)
+
+
+def _write_log(f: BinaryIO, lines: list[bytes]) -> None:
+    """Write a batch of JSONL lines to an open log file and flush it."""
+    try:
+        f.write(b"".join(lines))
+        f.flush()
+    except Exception as exc:
+        print(f"[!] Logging failed: {exc}")
+
+
+def _flush_log(lines: list[bytes]) -> None:
+    """Append a batch of JSONL lines to the log file in a single call."""
+    try:
+        with open(LOG_FILE, "ab") as f:
+            _write_log(f, lines)
+    except Exception as exc:
+        print(f"[!] Logging failed: {exc}")
+
+
+def _open_log() -> BinaryIO | None:
+    """Open the log file for appending, or return None if it cannot be opened."""
+    try:
+        return open(LOG_FILE, "ab")
+    except Exception as exc:
+        print(f"[!] Logging failed: {exc}")
+        return None
+
+
+def _reopen_log() -> BinaryIO | None:
+    """Open the log via _open_log, backing off for LOG_ROTATE_RETRY seconds on failure."""
+    global rotate_retry_at
+    f = _open_log()
+    if f is None:
+        rotate_retry_at = time.monotonic() + LOG_ROTATE_RETRY
+    return f
+
+
+def _move_log_aside() -> None:
+    """Rename the live log to assessments-<timestamp>.jsonl."""
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    os.replace(LOG_FILE, os.path.join(LOG_DIR, f"assessments-{stamp}.jsonl"))
+
+
+def _rotate_log_path() -> None:
+    """Rotate the log by path when the writer has no open handle."""
+    global rotate_retry_at
+    try:
+        if os.path.exists(LOG_FILE) and os.path.getsize(LOG_FILE) >= LOG_ROTATE_BYTES:
+            _move_log_aside()
+    except Exception as exc:
+        print(f"[!] Log rotation failed: {exc}")
+        rotate_retry_at = time.monotonic() + LOG_ROTATE_RETRY
+
+
+def _rotate_log(f: BinaryIO) -> BinaryIO | None:
+    """Rotate the open log to assessments-<timestamp>.jsonl once it exceeds LOG_ROTATE_BYTES.
+
+    Returns the handle to keep writing to (None if the log could not be
+    reopened). A failed rotation is not retried for LOG_ROTATE_RETRY seconds.
+    """
+    global rotate_retry_at
+    if time.monotonic() < rotate_retry_at:
+        return f
+    try:
+        if os.fstat(f.fileno()).st_size < LOG_ROTATE_BYTES:
+            return f
+        f.close()
+        _move_log_aside()
+    except Exception as exc:
+        print(f"[!] Log rotation failed: {exc}")
+        rotate_retry_at = time.monotonic() + LOG_ROTATE_RETRY
+        if not f.closed:
+            return f
+    return _reopen_log()
+
+
+def _write_batch(f: BinaryIO | None, lines: list[bytes]) -> BinaryIO | None:
+    """Write a batch to the open log, rotating it if needed; returns the handle to use next.
+
+    Without a handle (the log could not be opened), the batch is appended by
+    opening the file once. Once the back-off has passed, the log is rotated
+    by path if needed and the handle is reacquired.
+    """
+    if f is None:
+        _flush_log(lines)
+        if time.monotonic() < rotate_retry_at:
+            return None
+        _rotate_log_path()
+        if time.monotonic() < rotate_retry_at:
+            return None
+        return _reopen_log()
+    _write_log(f, lines)
+    return _rotate_log(f)
+
+
+async def _log_writer(queue: asyncio.Queue) -> None:
+    """Drain queued log lines and flush them in batches until a None sentinel arrives.
+
+    The log file stays open between batches, so each batch costs a single
+    write() rather than open/write/close. Size-based rotation also happens
+    here, off the request path.
+    """
+    loop = asyncio.get_running_loop()
+    stop = False
+    f = await loop.run_in_executor(None, _reopen_log)
+    try:
+        while not stop:
+            line = await queue.get()
+            if line is None:
+                break
+            buf = [line]
+            size = len(line)
+            deadline = loop.time() + LOG_FLUSH_INTERVAL
+            while size < LOG_FLUSH_BYTES:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    line = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if line is None:
+                    stop = True
+                    break
+                buf.append(line)
+                size += len(line)
+            f = await loop.run_in_executor(None, _write_batch, f, buf)
+    finally:
+        if f is not None:
+            f.close()
+
+
 def log_assessment(request_data: dict, response_data: dict) -> None:
-    """Append assessment to JSON log file."""
+    """Queue assessment for the background JSONL log writer."""
     entry = {
-        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc),
         "request": request_data,
         "response": response_data,
     }
     try:
-        if os.path.exists(LOG_FILE):
-            with open(LOG_FILE, "r", encoding="utf-8") as f:
-                logs = json.load(f)
-        else:
-            logs = []
-        logs.append(entry)
-        with open(LOG_FILE, "w", encoding="utf-8") as f:
-            json.dump(logs, f, indent=2)
+        try:
+            line = orjson.dumps(entry) + b"\n"
+        except orjson.JSONEncodeError:
+            # orjson is limited to 64-bit integers; stdlib json is not
+            entry["timestamp"] = entry["timestamp"].isoformat()
+            line = json.dumps(entry, separators=(",", ":")).encode() + b"\n"
     except Exception as exc:
         print(f"[!] Logging failed: {exc}")
+        return
+    if log_queue is not None:
+        log_queue.put_nowait(line)
+    else:
+        # Writer not running (e.g. called outside the app lifespan)
+        _flush_log([line])
+
+
+def log_segments(log_dir: str | None = None) -> list[str]:
+    """Return the JSONL log files oldest first: rotated segments, then the live log."""
+    log_dir = LOG_DIR if log_dir is None else log_dir
+    # Segment timestamps are fixed-width UTC, so name order is time order
+    paths = sorted(glob.glob(os.path.join(log_dir, "assessments-*.jsonl")))
+    live = os.path.join(log_dir, os.path.basename(LOG_FILE))
+    if os.path.exists(live):
+        paths.append(live)
+    return paths
+
+
+def read_assessments(log_dir: str | None = None) -> Iterator[dict]:
+    """Yield logged assessments from all log segments, oldest first."""
+    for path in log_segments(log_dir):
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    # stdlib json keeps integers beyond 64 bits exact
+                    yield json.loads(line)
 
 # ---------------------------------------------------------------------------
 # Endpoint
@@ -236,35 +586,26 @@ def log_assessment(request_data: dict, response_data: dict) -> None:
 async def assess(req: AssessmentRequest):
     """Run triage assessment on patient input."""
 
-    # 1. Extract symptoms from free-text
-    detected = extract_symptoms(req.symptoms)
-
-    # 2. Predict with ML model
-    X = vectorizer.transform([req.symptoms])
-    probas = classifier.predict_proba(X)[0]
-    class_labels = list(classifier.classes_)
+    # 1. Extract symptoms, predict with ML model, check critical override
+    #    (cached per lowercased symptom text)
+    text_lower = normalize_text(req.symptoms)
+    detected_tuple, model_prob, critical = analyze_symptoms(text_lower)
+    detected = list(detected_tuple)
 
-    # Get the max probability (used for risk score)
-    high_idx = class_labels.index("High") if "High" in class_labels else -1
-    model_prob = float(probas[high_idx]) if high_idx >= 0 else float(max(probas))
-
-    # 3. Risk scoring factors
+    # 2. Risk scoring factors
     age_factor, age_info = compute_age_factor(req.age)
     comorbidity_factor, comorbidity_info = compute_comorbidity_factor(req.comorbidities)
 
-    # 4. Composite risk score
+    # 3. Composite risk score
     risk_score = round((model_prob * 5) + age_factor + comorbidity_factor, 2)
 
-    # 5. Critical override check
-    critical = check_critical_override(req.symptoms)
-
-    # 6. Classification
+    # 4. Classification
     risk_level = classify_risk(risk_score, critical)
 
-    # 7. Explanation
+    # 5. Explanation
     explanation = build_explanation(detected, age_info, comorbidity_info, risk_level, critical)
 
-    # 8. Build response
+    # 6. Build response
     response = AssessmentResponse(
         risk_level=risk_level,
         risk_score=risk_score,
@@ -273,7 +614,7 @@ async def assess(req: AssessmentRequest):
         recommended_action=recommended_action(risk_level),
     )
 
-    # 9. Log
+    # 7. Log
     log_assessment(req.model_dump(), response.model_dump())
 
     return response
@@ -5,7 +5,6 @@ and saves the model artifacts for use by the FastAPI backend.
 """
 
 import os
-import random
 import joblib
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -87,32 +86,29 @@ HIGH_SYMPTOMS = [
 ]
 
 
-def _make_sample(symptom_pool: list[str], label: str, n_combos: int = 1) -> tuple[str, str]:
-    """Create a single (symptom_text, label) sample."""
-    chosen = random.sample(symptom_pool, min(n_combos, len(symptom_pool)))
-    return ", ".join(chosen), label
+def _sample_pool(rng: np.random.Generator, symptom_pool: list[str], n_samples: int) -> list[str]:
+    """Draw n_samples texts of 1-3 distinct symptoms from a pool in one batch."""
+    pool = np.array(symptom_pool, dtype=object)
+    n_combos = rng.integers(1, 4, size=n_samples)
+    # Row-wise argsort of random keys gives an independent permutation per
+    # sample; its first n_combos[i] columns are a draw without replacement.
+    perms = np.argsort(rng.random((n_samples, len(pool))), axis=1)
+    return [", ".join(pool[row[:k]]) for row, k in zip(perms, n_combos)]
 
 
-def generate_dataset(n_per_class: int = 120) -> tuple[list[str], list[str]]:
+def generate_dataset(n_per_class: int = 120, seed: int = 42) -> tuple[list[str], list[str]]:
     """Generate a balanced synthetic dataset."""
+    rng = np.random.default_rng(seed)
     texts: list[str] = []
     labels: list[str] = []
 
-    for _ in range(n_per_class):
-        # Low
-        t, l = _make_sample(LOW_SYMPTOMS, "Low", random.randint(1, 3))
-        texts.append(t)
-        labels.append(l)
-
-        # Moderate
-        t, l = _make_sample(MODERATE_SYMPTOMS, "Moderate", random.randint(1, 3))
-        texts.append(t)
-        labels.append(l)
-
-        # High
-        t, l = _make_sample(HIGH_SYMPTOMS, "High", random.randint(1, 3))
-        texts.append(t)
-        labels.append(l)
+    for pool, label in (
+        (LOW_SYMPTOMS, "Low"),
+        (MODERATE_SYMPTOMS, "Moderate"),
+        (HIGH_SYMPTOMS, "High"),
+    ):
+        texts.extend(_sample_pool(rng, pool, n_per_class))
+        labels.extend([label] * n_per_class)
 
     return texts, labels
 
@@ -122,9 +118,6 @@ def train_and_save(model_dir: str | None = None) -> tuple:
     if model_dir is None:
         model_dir = os.path.dirname(os.path.abspath(__file__))
 
-    random.seed(42)
-    np.random.seed(42)
-
     print("=" * 60)
     print("  Acuvia ML — Training Pipeline")
     print("=" * 60)
@@ -134,7 +127,8 @@ def train_and_save(model_dir: str | None = None) -> tuple:
     print(f"\n[OK] Generated {len(texts)} training samples ({len(texts)//3} per class)")
 
     # 2. TF-IDF Vectorization
-    vectorizer = TfidfVectorizer(max_features=500, ngram_range=(1, 2))
+    # float32 halves the feature matrix and the saved artifact size
+    vectorizer = TfidfVectorizer(max_features=500, ngram_range=(1, 2), dtype=np.float32)
     X = vectorizer.fit_transform(texts)
     print(f"[OK] TF-IDF matrix shape: {X.shape}")
 
@@ -146,6 +140,8 @@ def train_and_save(model_dir: str | None = None) -> tuple:
     # 4. Logistic Regression
     model = LogisticRegression(max_iter=1000, random_state=42, multi_class="multinomial")
     model.fit(X_train, y_train)
+    model.coef_ = model.coef_.astype(np.float32)
+    model.intercept_ = model.intercept_.astype(np.float32)
 
     # 5. Evaluation
     y_pred = model.predict(X_test)
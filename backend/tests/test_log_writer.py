@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "LOG_FILE", str(tmp_path / "assessments.jsonl"))
+    monkeypatch.setattr(main, "LOG_ROTATE_RETRY", 0.0)
+    monkeypatch.setattr(main, "rotate_retry_at", 0.0)
+    return tmp_path
+
+
+def _fail_open_calls(monkeypatch, failing: set[int]) -> None:
+    """Make the given (1-based) calls to main._open_log fail."""
+    real_open_log = main._open_log
+    calls = 0
+
+    def open_log():
+        nonlocal calls
+        calls += 1
+        if calls in failing:
+            print("[!] Logging failed: injected")
+            return None
+        return real_open_log()
+
+    monkeypatch.setattr(main, "_open_log", open_log)
+
+
+def _line(i: int) -> bytes:
+    return b'{"i":%d,"pad":"%s"}\n' % (i, b"x" * 80)
+
+
+def test_writer_reacquires_handle_after_failed_startup_open(log_dir, monkeypatch):
+    _fail_open_calls(monkeypatch, {1})
+
+    f = main._reopen_log()
+    assert f is None
+    f = main._write_batch(f, [_line(0)])
+    assert f is not None
+    f = main._write_batch(f, [_line(1)])
+    f.close()
+
+    assert [r["i"] for r in main.read_assessments()] == [0, 1]
+
+
+def test_rotation_resumes_after_failed_reopen(log_dir, monkeypatch):
+    monkeypatch.setattr(main, "LOG_ROTATE_BYTES", 2000)
+    # Call 1 is the initial open; call 2 is the reopen after the first rotation
+    _fail_open_calls(monkeypatch, {2})
+
+    f = main._reopen_log()
+    for i in range(200):
+        f = main._write_batch(f, [_line(i)])
+    assert f is not None
+    f.close()
+
+    segments = main.log_segments()
+    assert len(segments) > 5
+    assert os.path.getsize(main.LOG_FILE) < 2000 + len(_line(0))
+    assert [r["i"] for r in main.read_assessments()] == list(range(200))
+
+
+def test_rotation_continues_by_path_while_reopen_keeps_failing(log_dir, monkeypatch):
+    monkeypatch.setattr(main, "LOG_ROTATE_BYTES", 2000)
+    # Every open after the first fails, so batches go through _flush_log
+    _fail_open_calls(monkeypatch, set(range(2, 1000)))
+
+    f = main._reopen_log()
+    for i in range(200):
+        f = main._write_batch(f, [_line(i)])
+    assert f is None
+
+    assert len(main.log_segments()) > 5
+    assert os.path.getsize(main.LOG_FILE) < 2000 + len(_line(0))
+    assert [r["i"] for r in main.read_assessments()] == list(range(200))
@@ -0,0 +1,75 @@
+import copy
+import random
+
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+import main
+from model.train import LOW_SYMPTOMS, MODERATE_SYMPTOMS, HIGH_SYMPTOMS, generate_dataset
+
+
+def _sklearn_high_prob(vec, clf, text: str) -> float:
+    return float(clf.predict_proba(vec.transform([text]))[0][main.high_idx])
+
+
+def test_fused_predict_matches_sklearn(trained_model):
+    vec, clf = trained_model
+    main.load_model(vec, clf)
+    assert main.fast_predict
+
+    pool = LOW_SYMPTOMS + MODERATE_SYMPTOMS + HIGH_SYMPTOMS + ["", "x", "pain pain pain", "chest chest"]
+    rng = random.Random(0)
+    for _ in range(2000):
+        text = ", ".join(rng.sample(pool, rng.randint(0, 4))).lower()
+        assert main.predict_high_prob(text) == pytest.approx(
+            _sklearn_high_prob(vec, clf, text), abs=1e-6
+        )
+
+
+@pytest.mark.parametrize("setting, value", [
+    ("sublinear_tf", True),
+    ("norm", "l1"),
+    ("analyzer", "char"),
+    ("stop_words", "english"),
+])
+def test_unsupported_vectorizer_falls_back_to_sklearn(trained_model, setting, value):
+    vec, clf = trained_model
+    vec = copy.deepcopy(vec)
+    setattr(vec, setting, value)
+    main.load_model(vec, clf)
+    assert not main.fast_predict
+
+    text = "chest pain and shortness of breath"
+    assert main.predict_high_prob(text) == _sklearn_high_prob(vec, clf, text)
+
+
+@pytest.mark.parametrize("classes, params", [
+    (("Low", "High"), {}),
+    (("Low", "Moderate", "High"), {"multi_class": "ovr"}),
+    (("Low", "Moderate", "High"), {"solver": "liblinear"}),
+    (("Low", "Moderate", "High"), {"solver": "newton-cholesky"}),
+])
+@pytest.mark.filterwarnings("ignore::FutureWarning")
+def test_non_softmax_classifier_falls_back_to_sklearn(trained_model, classes, params):
+    vec, _ = trained_model
+    texts, labels = generate_dataset(n_per_class=50)
+    keep = [i for i, label in enumerate(labels) if label in classes]
+    clf = LogisticRegression(max_iter=1000, random_state=42, **params)
+    clf.fit(vec.transform([texts[i] for i in keep]), [labels[i] for i in keep])
+    main.load_model(vec, clf)
+    assert not main.fast_predict
+
+    text = "cough fever"
+    assert main.predict_high_prob(text) == _sklearn_high_prob(vec, clf, text)
+
+
+@pytest.mark.filterwarnings("ignore::FutureWarning")
+def test_probe_rejects_fused_predictor_that_disagrees(trained_model, monkeypatch):
+    vec, _ = trained_model
+    texts, labels = generate_dataset(n_per_class=50)
+    clf = LogisticRegression(max_iter=1000, random_state=42, multi_class="ovr")
+    clf.fit(vec.transform(texts), labels)
+    # Pretend the settings check passed for a model the fused path gets wrong
+    monkeypatch.setattr(main, "_supports_fast_predict", lambda v, c: True)
+    main.load_model(vec, clf)
+    assert not main.fast_predict